@@ -11,5 +11,5 @@ setup(
     packages=['mpltikztext'],
     package_dir = {'mpltikztext':'src'},
     zip_safe = False,
-    install_requires = ['matplotlib>=1.5']
+    install_requires = ['matplotlib>=3.3']
 )
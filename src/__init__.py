@@ -1 +1,2 @@
 from .tikztext import save_matplotlib_for_paper as savefig
+from .tikztext import Saver
@@ -4,9 +4,26 @@ hence is easily editable from within LaTeX to match the document style.
 """
 
 import matplotlib as mpl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
-from collections import Counter, defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_for_all
+from contextlib import contextmanager
 import os
+import pickle
+import re
+import sys
+
+# Pool of worker processes that write the image files; created the
+# first time it is needed.  Matplotlib isn't threadsafe, hence
+# processes rather than threads.
+_executor = None
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor()
+    return _executor
 
 def active_texts(figure):
     """
@@ -16,95 +33,296 @@ def active_texts(figure):
     labeled, but disables them so they are not shown.
     """
     texts = figure.findobj(mpl.text.Text)
-    return [T for T in texts if T.get_text() and T._renderer is not None]
+    return [T for T in texts
+            if T.get_text() and T._renderer is not None and T.get_visible()]
 
 def display_to_tikz(figure):
     """
     In the TikZ overlay, the horizontal coordinate ranges from 0 to
     100 and the vertical coordinate ranges from 0 to 100/A where A is
-    the aspect ratio (width/height). This function returns the
-    tranformation *from* the display coordinates of the matplotlib
-    figure *to* the TikZ overlay coordinates.
+    the aspect ratio (width/height). The tranformation *from* the
+    display coordinates of the matplotlib figure *to* the TikZ overlay
+    coordinates is thus a uniform scaling, and this function returns
+    its scale factor.
+
+    It only depends on the size of the figure, so compute it once and
+    pass it along as "to_tikz" to the functions below when handling
+    many artists.
     """
     D = figure.transFigure  # figure -> display
-    assert all(D.transform([0, 0]) == 0)
-    width, height = D.transform([1, 1])
-    A = 100.0/width
-    return mpl.transforms.Affine2D(np.diag([A, A, 1.0]))
+    (x0, y0), (width, height) = D.transform([[0.0, 0.0], [1.0, 1.0]])
+    assert x0 == 0.0 and y0 == 0.0
+    return 100.0/width
 
-def tikz_position(artist):
+def tikz_position(artist, to_tikz=None):
     """
     Returns the position of the artist in the TikZ coordinate system.
     """
-    figure = artist.get_figure()
-    artist_to_tikz = artist.get_transform() + display_to_tikz(figure)
-    return artist_to_tikz.transform(artist.get_position())
+    if to_tikz is None:
+        to_tikz = display_to_tikz(artist.get_figure())
+    artist_to_display = artist.get_transform()
+    return to_tikz * artist_to_display.transform(artist.get_position())
 
-def convert_text_to_tikz(text):
-    if not text.get_visible():
-        return ''
-    # Get TikZ node options
-    horizontal = {'left':'right',
+def tikz_positions(figure, artists, to_tikz=None):
+    """
+    Returns an (N, 2) array of the positions of the given artists in
+    the TikZ coordinate system.  Artists sharing a transform are
+    converted together with a single call to transform.
+    """
+    if to_tikz is None:
+        to_tikz = display_to_tikz(figure)
+    groups = dict()
+    for i, artist in enumerate(artists):
+        transform = artist.get_transform()
+        groups.setdefault(id(transform), (transform, []))[1].append(i)
+    positions = np.empty((len(artists), 2))
+    for transform, indices in groups.values():
+        points = [artists[i].get_position() for i in indices]
+        positions[indices] = transform.transform(points)
+    return to_tikz * positions
+
+# TikZ node anchors for matplotlib's horizontal and vertical alignments.
+_tikz_horizontal = {'left':'right',
+                    'center':'',
+                    'right':'left'}
+_tikz_vertical = {'top':'below',
+                  'bottom':'above',
                   'center':'',
-                  'right':'left'}[text.get_horizontalalignment()]
-    vertical = {'top':'below',
-                'bottom':'above',
-                'center':'',
-                'baseline':'',
-                'center_baseline':''}[text.get_verticalalignment()]
-    horvert = vertical + ' ' + horizontal
+                  'baseline':'',
+                  'center_baseline':''}
+
+# The node options for each of the few possible pairs of alignments.
+_tikz_anchors = {(h, v): vertical + ' ' + horizontal
+                 for h, horizontal in _tikz_horizontal.items()
+                 for v, vertical in _tikz_vertical.items()}
+
+# Replaces the unicode minus sign used in tick labels.
+_tikz_translation = str.maketrans({u'\u2212': '-'})
+
+# Plain numbers, e.g. tick labels, which are typeset in math mode.
+_number_regexp = re.compile(r'[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?')
+
+def convert_text_to_tikz(text, xy=None):
+    """
+    Returns the TikZ command drawing the given Text.  The position xy
+    in TikZ coordinates can be given, e.g. when computed by
+    tikz_positions; otherwise it is computed here.
+    """
+    # Get TikZ node options
+    horvert = _tikz_anchors[text.get_horizontalalignment(),
+                            text.get_verticalalignment()]
     if text.get_rotation():
-        horvert = 'rotate=%.1f' % text.get_rotation()
+        horvert = f'rotate={text.get_rotation():.1f}'
     # Clean up the string itself.
-    text_str = text.get_text().replace(r'\mathdefault', '').replace(u'\u2212', '-')
-    try:  # Make tick labels in mathmode.
-        float(text_str)
+    text_str = text.get_text().replace(r'\mathdefault', '').translate(_tikz_translation)
+    if _number_regexp.fullmatch(text_str):  # Make tick labels in mathmode.
         text_str = '$' + text_str + '$'
-    except ValueError:
-        pass
     # Get the TikZ coordinates
-    x, y = tikz_position(text)
+    if xy is None:
+        xy = tikz_position(text)
+    x, y = xy
     if '\n' in text_str:
         horvert = ','.join([horvert,
                             'align=' + text.get_horizontalalignment()])
         text_str = text_str.replace('\n', ' \\\\\n')
-    return "  \\draw (%.6f, %.6f) node[%s] {%s};" % (x, y,
-                                                     horvert.strip(),
-                                                     text_str)
+    return f"  \\draw ({x:.6f}, {y:.6f}) node[{horvert.strip()}] {{{text_str}}};"
 
-def save_without_text(figure, filename, **kwargs):
+def convert_texts_to_tikz(figure, texts, to_tikz=None):
     """
-    Saves the figure with all the text removed. It does so by setting
-    the opacity alpha to 0 for each Text artist.  I also tried
-    "set_visible(False)" which mostly works but things can move
-    slightly.
+    Returns the list of TikZ commands drawing the given Texts, with
+    all their positions computed in one batch by tikz_positions.
+    """
+    positions = tikz_positions(figure, texts, to_tikz)
+    # Python floats format faster than numpy scalars.
+    return [convert_text_to_tikz(text, xy)
+            for text, xy in zip(texts, positions.tolist())]
+
+def finalize_figure(figure):
+    """
+    Draws the figure, without saving it anywhere, so that matplotlib
+    decides which Text artists are actually shown.  Returns the
+    renderer used.  If the figure's canvas can't render on its own,
+    the drawing is done on a temporary Agg canvas, after which the
+    figure gets its own canvas back.  Nothing is drawn if the figure
+    has an Agg canvas and hasn't changed since it was last drawn.
+    """
+    canvas = figure.canvas
+    if isinstance(canvas, FigureCanvasAgg):
+        if figure.stale:
+            canvas.draw()
+        return canvas.get_renderer()
+    agg_canvas = FigureCanvasAgg(figure)
+    try:
+        agg_canvas.draw()
+    finally:
+        figure.set_canvas(canvas)
+    return agg_canvas.get_renderer()
+
+def resolve_tight_bbox(figure, kwargs, renderer=None):
+    """
+    If the savefig options in kwargs ask for bbox_inches='tight',
+    replace that with the explicit bounding box it stands for.
+    Otherwise, matplotlib does an extra dummy render on every savefig
+    call just to compute the same box again.  The renderer should be
+    the one returned by finalize_figure; if not given, finalize_figure
+    is called here.
+
+    The box is measured with that (Agg) renderer at the figure's own
+    dpi, whereas savefig measures it with the output's renderer at the
+    saved dpi.  Text extents differ slightly between the two, so the
+    crop can be off from plain savefig(bbox_inches='tight') by a
+    fraction of a point, i.e. a pixel or so at high dpi.
+    """
+    bbox = kwargs.get('bbox_inches', mpl.rcParams['savefig.bbox'])
+    pad = kwargs.get('pad_inches', None)
+    if bbox != 'tight' or isinstance(pad, str):
+        return
+    if pad is None:
+        pad = mpl.rcParams['savefig.pad_inches']
+    if renderer is None:
+        renderer = finalize_figure(figure)
+    extra = kwargs.get('bbox_extra_artists', None)
+    tight = figure.get_tightbbox(renderer, bbox_extra_artists=extra)
+    kwargs['bbox_inches'] = tight.padded(pad)
+    kwargs.pop('pad_inches', None)
+
+@contextmanager
+def texts_hidden(texts):
+    """
+    Context manager setting the opacity alpha to 0 for each of the
+    given Text artists, restoring the original alphas on exit.
     """
-    kwargs['transparent'] = True
-    figure.savefig(filename, **kwargs)  # Hack to finalize the figure.
-    texts = active_texts(figure)
     alphas = dict()
     for text in texts:
         alphas[text] = text.get_alpha()
         text.set_alpha(0.0)
+    try:
+        yield
+    finally:
+        for text in texts:
+            text.set_alpha(alphas[text])
+
+# Options for the Pillow encoder used by savefig, keyed by image
+# format.  These favor speed over file size as the images tend to be
+# regenerated many times while working on a paper; any "pil_kwargs"
+# passed to savefig take precedence.
+fast_pil_kwargs = {'png': {'compress_level': 1}}
+
+def _image_format(filename, kwargs):
+    # The format savefig will use: the one given explicitly, else the
+    # file's extension, else the default.  The file may also be a
+    # file-like object, which has no extension.
+    image_format = kwargs.get('format')
+    if not image_format and isinstance(filename, (str, bytes, os.PathLike)):
+        image_format = os.path.splitext(os.fsdecode(filename))[1][1:]
+    if not image_format:
+        image_format = mpl.rcParams['savefig.format']
+    return image_format.lower()
+
+def _prepare_to_save_without_text(figure, filename, texts, kwargs):
+    kwargs['transparent'] = True
+    fast = fast_pil_kwargs.get(_image_format(filename, kwargs))
+    if fast is not None:
+        kwargs['pil_kwargs'] = {**fast, **(kwargs.get('pil_kwargs') or {})}
+    renderer = None
+    if texts is None:
+        renderer = finalize_figure(figure)
+        texts = active_texts(figure)
+    resolve_tight_bbox(figure, kwargs, renderer)
+    return texts
+
+def save_without_text(figure, filename, texts=None, **kwargs):
+    """
+    Saves the figure with all the text removed. It does so by setting
+    the opacity alpha to 0 for each Text artist.  I also tried
+    "set_visible(False)" which mostly works but things can move
+    slightly.
+
+    Passing bbox_inches='tight' works, but the bounding box is computed
+    once up front, with the text still present, and then handed to
+    savefig as an explicit Bbox.  As it is measured at the figure's dpi,
+    the crop can differ very slightly from matplotlib's own; see
+    resolve_tight_bbox.
+
+    If "texts" is given, it must be the result of active_texts for the
+    already finalized figure; otherwise, it is computed here.  Either
+    way, the list of texts is returned for reuse.
+
+    PNG files are written with zlib compression level 1 rather than
+    the usual 6, which is much faster at the cost of somewhat larger
+    files; see fast_pil_kwargs.  Pass e.g. pil_kwargs={'compress_level': 6}
+    to override.
+    """
+    texts = _prepare_to_save_without_text(figure, filename, texts, kwargs)
+    with texts_hidden(texts):
+        figure.savefig(filename, **kwargs)
+    return texts
+
+def _save_pickled_figure(pickled_figure, filename, kwargs):
+    # Runs in a worker process.
+    figure = pickle.loads(pickled_figure)
+    # A plain Figure(), unlike a pyplot one, unpickles with a bare
+    # FigureCanvasBase, which makes savefig look up a backend and build
+    # a temporary canvas; with an Agg canvas attached, raster formats
+    # print directly.
+    if not isinstance(figure.canvas, FigureCanvasAgg):
+        FigureCanvasAgg(figure)
     figure.savefig(filename, **kwargs)
-    for text in texts:
-        text.set_alpha(alphas[text])
+    # Unpickling a pyplot figure registers it with pyplot, so let go
+    # of it to keep the worker from accumulating figures.
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    if pyplot is not None:
+        pyplot.close(figure)
+
+def save_without_text_in_background(figure, filename, texts=None, **kwargs):
+    """
+    Same as save_without_text, except that the (expensive) encoding
+    and writing of the file happens in a separate worker process.  A
+    snapshot of the figure is taken before returning, so the figure
+    can be used, or even changed, right away.  Returns a
+    concurrent.futures.Future whose result() waits for the file to be
+    written and reraises any error from savefig.
 
-def record_data_coor_sys_for_tikz(axis):
+    Figures that can't be pickled, e.g. because a tick formatter is a
+    lambda, are saved right here instead.
+
+    Worker processes re-import the main script when multiprocessing
+    uses the "spawn" or "forkserver" start method, the default on
+    macOS and Windows, and on Linux from Python 3.14.  So the calling
+    script must guard its top level with 'if __name__ == "__main__":'.
+    """
+    texts = _prepare_to_save_without_text(figure, filename, texts, kwargs)
+    with texts_hidden(texts):
+        try:
+            pickled_figure = pickle.dumps(figure)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            figure.savefig(filename, **kwargs)
+            done = Future()
+            done.set_result(None)
+            return done
+    return _get_executor().submit(_save_pickled_figure,
+                                  pickled_figure, filename, kwargs)
+
+# TikZ scope whose coordinates are those of the data plotted on an axis.
+_coor_sys_template = """\
+  %% Internal axis coordinate system
+  \\begin{scope}[shift={(%.8f, %.8f)},
+                xscale=%.8f, yscale=%.8f]
+      %%\\draw[red] (%.6f, %.6f) rectangle (%.6f, %.6f);
+  \\end{scope}"""
+
+def record_data_coor_sys_for_tikz(axis, to_tikz=None):
     if axis.xaxis.get_scale() == 'log' or axis.yaxis.get_scale() == 'log':
         return "  % No internal axis coordinate system as there is a log scale."
-    data_to_tikz = axis.transData + display_to_tikz(axis.figure)
-    shift = data_to_tikz.transform([0.0, 0.0])
-    delta = data_to_tikz.transform([1.0, 1.0]) - shift
+    if to_tikz is None:
+        to_tikz = display_to_tikz(axis.figure)
+    data_to_display = axis.transData
+    corners = to_tikz * data_to_display.transform([[0.0, 0.0], [1.0, 1.0]])
+    shift = corners[0]
+    delta = corners[1] - shift
     dL = axis.dataLim
-    data_rect = (dL.x0, dL.y0, dL.x1, dL.y1)
-    content =  "  % Internal axis coordinate system\n"
-    content += "  \\begin{scope}[shift={(%.8f, %.8f)},\n" % tuple(shift)
-    content += "                xscale=%.8f, yscale=%.8f]\n" % tuple(delta)
-    content += "      %"
-    content += "\\draw[red] (%.6f, %.6f) rectangle (%.6f, %.6f);\n" % data_rect
-    content += "  \\end{scope}"
-    return content
+    return _coor_sys_template % (shift[0], shift[1], delta[0], delta[1],
+                                 dL.x0, dL.y0, dL.x1, dL.y1)
 
 
 def save_matplotlib_for_paper(figure, file_name, path='plots/', image_only=False, **kwargs):
@@ -122,43 +340,124 @@ def save_matplotlib_for_paper(figure, file_name, path='plots/', image_only=False
     just underlying image.  This is useful if you have hand-edited the
     TikZ file already but want to (slightly) tweak the matplotlib
     figure.
+
+    To write the images of many figures in parallel, see Saver.
     """
+    _save_for_paper(figure, file_name, path, image_only, kwargs)
+
+def _save_for_paper(figure, file_name, path, image_only, kwargs, saves=None):
+    # Does the work of save_matplotlib_for_paper.  If a list "saves" is
+    # given, the images are instead written by worker processes, and
+    # the Future for each is appended to it as soon as it is submitted.
+
     # Setup paths
     image_path = os.path.join(path, 'images')
     base_name, file_ext = os.path.splitext(file_name)
     image_file = os.path.join(image_path, file_name)
 
     # Create target directories if they do not exist
-    if not os.path.exists(path):
-        os.mkdir(path)
-    if not os.path.exists(image_path):
-        print('Creating directory "%s"' % os.path.abspath(image_path))
+    os.makedirs(path, exist_ok=True)
+    try:
         os.mkdir(image_path)
+        print('Creating directory "%s"' % os.path.abspath(image_path))
+    except FileExistsError:
+        pass
 
-    # Save the image
+    # Figure out which texts are shown, once and for all.
+    renderer = finalize_figure(figure)
+    texts = active_texts(figure)
+    resolve_tight_bbox(figure, kwargs, renderer)
+
+    # Which image(s) to save; the TeX file refers to the first one.
     if 'dpi' in kwargs and isinstance(kwargs['dpi'], (list, tuple)):
         dpis_to_do = kwargs['dpi']
         file_name = base_name + f'_{dpis_to_do[0]}dpi' + file_ext
-        for dpi in dpis_to_do:
-            image_file = os.path.join(image_path, base_name + f'_{dpi}dpi' + file_ext)
-            kwargs['dpi'] = dpi
-            save_without_text(figure, image_file, **kwargs)
+        images = [(os.path.join(image_path, base_name + f'_{dpi}dpi' + file_ext), dpi)
+                  for dpi in dpis_to_do]
     else:
-        save_without_text(figure, image_file, **kwargs)
+        images = [(image_file, kwargs.get('dpi'))]
 
+    # The overlay is made first, since saving the image can move
+    # things like axis labels when savefig uses a different dpi.
     if not image_only:
         # Make TikZ overlay
-        contents = "%Set \graphicspath{{plots/images/}} to include the image files\n"
-        contents += "\\begin{tikzoverlay*}[width=0.8\\textwidth]{%s}\n" % (file_name,)
-        tikz_commands = [convert_text_to_tikz(text) for text in active_texts(figure)]
-        tikz_commands += [record_data_coor_sys_for_tikz(axis) for axis in figure.axes]
-        contents += "\n".join(tikz_commands)
-        contents += "\n\\end{tikzoverlay*}"
+        parts = ["%Set \\graphicspath{{plots/images/}} to include the image files",
+                 "\\begin{tikzoverlay*}[width=0.8\\textwidth]{%s}" % (file_name,)]
+        to_tikz = display_to_tikz(figure)
+        parts += convert_texts_to_tikz(figure, texts, to_tikz)
+        parts += [record_data_coor_sys_for_tikz(axis, to_tikz)
+                  for axis in figure.axes]
+        parts.append("\\end{tikzoverlay*}")
+        contents = "\n".join(parts)
         # Save to TeX file.
         texname = os.path.join(path, base_name + '.tex')
-        texfile = open(texname, 'w')
-        texfile.write(contents + '\n')
-        texfile.close()
+        with open(texname, 'w', buffering=1<<16) as texfile:
+            texfile.write(contents + '\n')
+
+    # Save the image(s)
+    for image_file, dpi in images:
+        if dpi is not None:
+            kwargs['dpi'] = dpi
+        if saves is not None:
+            saves.append(save_without_text_in_background(
+                figure, image_file, texts=texts, **kwargs))
+        else:
+            save_without_text(figure, image_file, texts=texts, **kwargs)
+
+class Saver:
+    """
+    Context manager for saving a batch of figures as with
+    save_matplotlib_for_paper, e.g.
+
+        with mpltikztext.Saver(path='plots') as saver:
+            saver.savefig(figure1, 'first.pdf')
+            saver.savefig(figure2, 'second.png', dpi=[150, 600])
+
+    Instead of waiting for the images of each figure before moving on
+    to the next, the images of the whole batch are written in parallel
+    by the same, already warmed up, worker processes, and the
+    with-block only exits once they are all on disk.  Any keyword
+    arguments given to Saver are defaults for each call to savefig.
+    The script using Saver needs a __main__ guard; see
+    save_without_text_in_background.
+    """
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self.saves = []
+
+    def savefig(self, figure, file_name, **kwargs):
+        """
+        Same as save_matplotlib_for_paper, except that it doesn't wait
+        for the images to be written.
+        """
+        options = {'path':'plots/', 'image_only':False}
+        options.update(self.defaults)
+        options.update(kwargs)
+        path = options.pop('path')
+        image_only = options.pop('image_only')
+        _save_for_paper(figure, file_name, path, image_only, options,
+                        saves=self.saves)
+
+    def wait(self):
+        """
+        Waits for all images so far to be written, then reraises the
+        first error encountered, if any.
+        """
+        saves, self.saves = self.saves, []
+        wait_for_all(saves)
+        for save in saves:
+            save.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.wait()
+        else:
+            # Don't let a failed save hide the original exception.
+            saves, self.saves = self.saves, []
+            wait_for_all(saves)
 
 
 def matplotlib_with_opts_matching_save(sage_graphic, **kwds):